@@ -2,24 +2,23 @@
 
 import asyncio
 import base64
+import hmac
 import json
 import logging
 import os
-import sys
-import traceback
+import threading
+import uuid
 from http import HTTPStatus
 from typing import Any, Dict
 
+from config import settings
+
 try:
-    from werkzeug.wrappers import Response
-except Exception:  # pragma: no cover - fallback if werkzeug missing
-    Response = None
+    import orjson
 
-from telegram import Update
-from telegram.error import TelegramError
-
-from bot.handlers import build_application
-from config import settings
+    _json_loads = orjson.loads
+except ImportError:  # pragma: no cover - stdlib fallback
+    _json_loads = json.loads
 
 logger = logging.getLogger(__name__)
 if not logger.handlers:
@@ -30,22 +29,12 @@ if not logger.handlers:
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     )
 
-def _log(message: str, payload: Any | None = None, *, stream=sys.stderr) -> None:
-    text = f"[webhook] {message}" if payload is None else f"[webhook] {message}: {payload}"
-    try:
-        stream.write(text + "\n")
-        stream.flush()
-    except Exception:
-        logger.debug("Failed to emit log line: %s", text)
-
-
 def _debug_log(message: str, payload: Any | None = None) -> None:
-    _log(message, payload, stream=sys.stderr)
-
-
-_log("module imported", stream=sys.stderr)
-_log("TELEGRAM_BOT_TOKEN present", bool(settings.telegram_token), stream=sys.stderr)
-_log("TELEGRAM_SECRET_TOKEN present", bool(settings.telegram_secret_token), stream=sys.stderr)
+    # Lazy %s formatting: no string work happens unless DEBUG is enabled.
+    if payload is None:
+        logger.debug("[webhook] %s", message)
+    else:
+        logger.debug("[webhook] %s: %s", message, payload)
 
 
 def _normalize_event(raw_event: Any) -> Dict[str, Any]:
@@ -53,7 +42,7 @@ def _normalize_event(raw_event: Any) -> Dict[str, Any]:
         return raw_event
     if isinstance(raw_event, str):
         try:
-            return json.loads(raw_event)
+            return _json_loads(raw_event)
         except Exception:
             return {}
     if raw_event is None:
@@ -64,46 +53,93 @@ def _normalize_event(raw_event: Any) -> Dict[str, Any]:
         return {}
 
 
+_response_cls: Any = None
+_response_resolved = False
+
+
 def _make_response(body: str, status: int = 200, *, content_type: str = "text/plain; charset=utf-8"):
-    if Response is not None:
-        return Response(body, status=status, content_type=content_type)
+    global _response_cls, _response_resolved
+    if not _response_resolved:
+        try:
+            from werkzeug.wrappers import Response
+
+            _response_cls = Response
+        except Exception:  # pragma: no cover - fallback if werkzeug missing
+            _response_cls = None
+        _response_resolved = True
+    if _response_cls is not None:
+        return _response_cls(body, status=status, content_type=content_type)
     return body, status, {"Content-Type": content_type}
 
 
-async def _process_update(update_json: Dict[str, Any]) -> None:
-    _debug_log("building application")
-    application = build_application()
-    initialized = False
-    started = False
+# The application and event loop live for the whole container lifetime: Vercel
+# keeps the process alive between warm invocations, so PTB setup (and its HTTP
+# connection pool) must be paid only once per cold start. The loop runs
+# forever on its own daemon thread; invocation threads only ever submit to it.
+_LOOP = asyncio.new_event_loop()
+_LOOP_THREAD = threading.Thread(target=_LOOP.run_forever, name="webhook-loop", daemon=True)
+_LOOP_THREAD.start()
 
-    try:
+
+def _run_coroutine(coro) -> None:
+    # Safe from any invocation thread: the loop never stops and is never
+    # driven from here, so there is no is_running()/run_until_complete race
+    # and no window where a submitted coroutine waits on a stopped loop.
+    asyncio.run_coroutine_threadsafe(coro, _LOOP).result()
+
+application: Any = None
+_application_ready = False
+_application_lock = asyncio.Lock()
+
+
+def _get_application():
+    global application
+    if application is None:
+        # Deferred so a GET healthcheck does not import PTB and every handler
+        # dependency; the priming call below still resolves it during cold start.
+        from bot.handlers import build_application
+
+        application = build_application()
+    return application
+
+
+async def _ensure_application_ready() -> None:
+    global _application_ready
+    if _application_ready:
+        return
+    async with _application_lock:
+        if _application_ready:
+            return
+        app = _get_application()
         _debug_log("initializing application")
-        await application.initialize()
-        initialized = True
+        await app.initialize()
         _debug_log("starting application")
-        await application.start()
-        started = True
+        await app.start()
+        _application_ready = True
 
-        update = Update.de_json(update_json, bot=application.bot)
-        _debug_log("processing update", update_json.get("update_id"))
-        await application.process_update(update)
-    finally:
-        await _shutdown_application(application, started=started, initialized=initialized)
 
+def _prime_telegram_pool() -> None:
+    """Open the Telegram connection pool during cold start, not on the first update."""
+    if not settings.telegram_token:
+        return
+    try:
+        _run_coroutine(_ensure_application_ready())
+        _run_coroutine(application.bot.get_me())
+        _debug_log("telegram connection pool primed")
+    except Exception as exc:
+        logger.warning("Failed to prime Telegram connection pool: %s", exc)
 
-async def _shutdown_application(application, *, started: bool, initialized: bool) -> None:
-    if started:
-        try:
-            _debug_log("stopping application")
-            await application.stop()
-        except Exception as exc:
-            logger.warning("Failed to stop application cleanly: %s", exc)
-    if initialized:
-        try:
-            _debug_log("shutting down application")
-            await application.shutdown()
-        except Exception as exc:
-            logger.warning("Failed to shutdown application cleanly: %s", exc)
+
+_prime_telegram_pool()
+
+
+async def _process_update(update_json: Dict[str, Any]) -> None:
+    from telegram import Update
+
+    await _ensure_application_ready()
+    update = Update.de_json(update_json, bot=application.bot)
+    _debug_log("processing update", update_json.get("update_id"))
+    await application.process_update(update)
 
 
 def handler(event, context=None):
@@ -114,20 +150,15 @@ def handler(event, context=None):
         event_dict = _normalize_event(event)
         return _handle_lambda_event(event_dict)
     except Exception as exc:
-        trace = "".join(traceback.format_exception(type(exc), exc, exc.__traceback__))
-        logger.exception("Unhandled error in webhook handler.")
-        print("[webhook] fatal handler error:", exc, flush=True)
-        print(trace, flush=True)
+        error_id = uuid.uuid4().hex[:8]
+        logger.exception("Unhandled error in webhook handler (error_id=%s).", error_id)
         return {
             "statusCode": HTTPStatus.INTERNAL_SERVER_ERROR,
-            "body": f"error: {exc}\n{trace}",
+            "body": f"error: {exc.__class__.__name__} (id={error_id})",
         }
 
 
 def _handle_lambda_event(event: Dict[str, Any]) -> Dict[str, Any]:
-    print("[webhook] handler invoked", flush=True)
-    print("[webhook] event keys:", list(event.keys()), flush=True)
-
     method = (event.get("httpMethod") or event.get("method") or "POST").upper()
     if method == "GET":
         return {"statusCode": 200, "body": "ok"}
@@ -138,20 +169,19 @@ def _handle_lambda_event(event: Dict[str, Any]) -> Dict[str, Any]:
 
     if event.get("isBase64Encoded"):
         try:
-            body = base64.b64decode(body).decode("utf-8")
+            # Keep bytes: the JSON parser accepts them directly, so the
+            # intermediate str copy (and its UTF-8 validation pass) is skipped.
+            body = base64.b64decode(body)
         except Exception:
             return {"statusCode": HTTPStatus.BAD_REQUEST, "body": "invalid base64 body"}
 
     headers = event.get("headers") or {}
-    _debug_log("headers", headers)
     status, message = _process_payload(body, headers)
     return {"statusCode": int(status), "body": message}
 
 
 def _handle_http_request(request) -> Any:
     method = (getattr(request, "method", None) or "POST").upper()
-    print("[webhook] handler invoked (http request)", flush=True)
-    print("[webhook] request method:", method, flush=True)
 
     if method == "GET":
         return _make_response("ok", status=200)
@@ -161,35 +191,34 @@ def _handle_http_request(request) -> Any:
         return _make_response("missing body", status=HTTPStatus.BAD_REQUEST)
 
     headers = dict(getattr(request, "headers", {}) or {})
-    _debug_log("headers", headers)
     status, message = _process_payload(body, headers)
     return _make_response(message, status=int(status))
 
 
-def _process_payload(body: str, headers: Dict[str, Any]) -> tuple[int, str]:
+def _process_payload(body: bytes | str, headers: Dict[str, Any]) -> tuple[int, str]:
+    from telegram.error import TelegramError
+
     if not _validate_secret(headers):
         return HTTPStatus.FORBIDDEN, "invalid secret"
 
     try:
-        update_json = json.loads(body)
-    except json.JSONDecodeError:
+        update_json = _json_loads(body)
+    except ValueError:
         return HTTPStatus.BAD_REQUEST, "invalid json"
 
     try:
-        _debug_log("received update", update_json)
-        asyncio.run(_process_update(update_json))
+        _run_coroutine(_process_update(update_json))
     except TelegramError as exc:  # pragma: no cover - defensive logging
         logger.exception("Telegram API error while processing update.")
-        traceback.print_exc()
         return HTTPStatus.INTERNAL_SERVER_ERROR, f"telegram error: {exc}"
     except Exception as exc:  # pragma: no cover - defensive logging
-        logger.exception("Unhandled error while processing update.")
-        trace = "".join(traceback.format_exception(type(exc), exc, exc.__traceback__))
-        print("[webhook] exception while processing update:", exc, flush=True)
-        print(trace, flush=True)
+        # The full traceback goes to the logs only; the response body stays
+        # terse with a correlation id for matching it up.
+        error_id = uuid.uuid4().hex[:8]
+        logger.exception("Unhandled error while processing update (error_id=%s).", error_id)
         return (
             HTTPStatus.INTERNAL_SERVER_ERROR,
-            f"error: {exc}\n{trace}\nToken present: {bool(settings.telegram_token)}",
+            f"error: {exc.__class__.__name__} (id={error_id})",
         )
 
     return HTTPStatus.OK, "ok"
@@ -199,7 +228,15 @@ def _validate_secret(headers: Dict[str, Any]) -> bool:
     expected = settings.telegram_secret_token
     if not expected:
         return True
-    for key, value in headers.items():
-        if key.lower() == "x-telegram-bot-api-secret-token":
-            return value == expected
-    return False
+    value = headers.get("x-telegram-bot-api-secret-token") or headers.get(
+        "X-Telegram-Bot-Api-Secret-Token"
+    )
+    if value is None:
+        # Rare: headers arrived with non-standard casing.
+        value = next(
+            (v for k, v in headers.items() if k.lower() == "x-telegram-bot-api-secret-token"),
+            None,
+        )
+    if value is None:
+        return False
+    return hmac.compare_digest(str(value), expected)
@@ -3,8 +3,10 @@
 from __future__ import annotations
 
 import asyncio
-import copy
+import concurrent.futures
+import functools
 import logging
+import re
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
@@ -20,6 +22,7 @@ from telegram.ext import (
     MessageHandler,
     filters,
 )
+from telegram.request import HTTPXRequest
 
 from config import settings
 
@@ -50,20 +53,31 @@ from .utils import (
     reset_user_session,
     set_current_question_message,
     toggle_multi_option,
-    build_question_answer_pairs,
-    collect_all_answers,
+    build_report_views,
 )
-from services import openai_service, pdf_service, sheets_service
 
 logger = logging.getLogger(__name__)
 
 Context = ContextTypes.DEFAULT_TYPE
 
+_START_INTRO_PATTERN = re.compile(r"^start_intro$")
+_SKILL_LEVEL_PATTERN = re.compile(r"^skill_level_")
+_VIDEO_PATTERN = re.compile(r"^(video_ready|start_diagnosis)$")
+_REPORT_PATTERN = re.compile(r"^generate_report$")
+_Q_PATTERN = re.compile(r"^q\|")
 
+# Shared pool for blocking service calls; the default executor on small
+# serverless instances has only a couple of threads and is shared with other
+# stdlib consumers.
+_EXECUTOR = concurrent.futures.ThreadPoolExecutor(max_workers=8, thread_name_prefix="bot-io")
+
+
+@functools.lru_cache(maxsize=1)
 def build_application() -> Application:
     application = (
         ApplicationBuilder()
         .token(settings.telegram_token)
+        .request(HTTPXRequest(connection_pool_size=8, http_version="1.1"))
         .concurrent_updates(True)
         .build()
     )
@@ -72,20 +86,20 @@ def build_application() -> Application:
         entry_points=[CommandHandler("start", start_command)],
         states={
             ConversationState.WELCOME: [
-                CallbackQueryHandler(handle_start_button, pattern="^start_intro$")
+                CallbackQueryHandler(handle_start_button, pattern=_START_INTRO_PATTERN)
             ],
             ConversationState.SKILL_LEVEL: [
-                CallbackQueryHandler(handle_skill_selection, pattern="^skill_level_")
+                CallbackQueryHandler(handle_skill_selection, pattern=_SKILL_LEVEL_PATTERN)
             ],
             ConversationState.VIDEO: [
                 CallbackQueryHandler(
-                    handle_video_confirmation, pattern="^(video_ready|start_diagnosis)$"
+                    handle_video_confirmation, pattern=_VIDEO_PATTERN
                 )
             ],
             ConversationState.DIAGNOSIS: _question_state_handlers(),
             ConversationState.READINESS: _question_state_handlers(),
             ConversationState.REPORT: [
-                CallbackQueryHandler(handle_report_request, pattern="^generate_report$")
+                CallbackQueryHandler(handle_report_request, pattern=_REPORT_PATTERN)
             ],
             ConversationState.CHAT: [
                 MessageHandler(filters.TEXT & ~filters.COMMAND, handle_chat_message)
@@ -101,9 +115,10 @@ def build_application() -> Application:
     return application
 
 
+@functools.lru_cache(maxsize=1)
 def _question_state_handlers():
     return [
-        CallbackQueryHandler(handle_question_callback, pattern=r"^q\|"),
+        CallbackQueryHandler(handle_question_callback, pattern=_Q_PATTERN),
         MessageHandler(filters.TEXT & ~filters.COMMAND, handle_text_response),
     ]
 
@@ -178,17 +193,18 @@ async def handle_video_confirmation(update: Update, context: Context) -> int:
 
 
 async def start_diagnosis_flow(chat_id: int, context: Context) -> int:
+    user_data = ensure_user_data(context.user_data)
     await context.bot.send_message(
         chat_id=chat_id,
         text=messages.DIAGNOSIS_INTRO,
         parse_mode=ParseMode.MARKDOWN,
     )
-    return await send_next_question(chat_id, context, is_new=True)
+    return await send_next_question(chat_id, context, user_data, is_new=True)
 
 
-async def send_next_question(chat_id: int, context: Context, is_new: bool = False) -> int:
-    user_data = ensure_user_data(context.user_data)
-
+async def send_next_question(
+    chat_id: int, context: Context, user_data: Dict[str, Any], is_new: bool = False
+) -> int:
     question: Optional[Question]
     if is_new:
         question = get_current_question(user_data)
@@ -198,11 +214,12 @@ async def send_next_question(chat_id: int, context: Context, is_new: bool = Fals
     if not question:
         return await handle_questionnaire_complete(chat_id, context)
 
-    return await _send_question(chat_id, context, question)
+    return await _send_question(chat_id, context, question, user_data)
 
 
-async def _send_question(chat_id: int, context: Context, question: Question) -> int:
-    user_data = ensure_user_data(context.user_data)
+async def _send_question(
+    chat_id: int, context: Context, question: Question, user_data: Dict[str, Any]
+) -> int:
     user_data.pop(AWAITING_TEXT_KEY, None)
     user_data.pop(AWAITING_OTHER_KEY, None)
 
@@ -227,27 +244,28 @@ async def _send_question(chat_id: int, context: Context, question: Question) ->
 
 
 def _format_question_text(question: Question, user_data: Dict[str, Any]) -> str:
-    text = question.text
     entry = get_answer(user_data, question.id, {})
+    if not isinstance(entry, dict):
+        return question.text
 
-    if isinstance(entry, dict):
-        selected_lines: List[str] = []
-        for key in entry.get("selected", []):
-            option = find_option_by_key(question, key)
-            if option:
-                selected_lines.append(f"- {option.text}")
+    selected_lines: List[str] = []
+    for key in entry.get("selected", ()):
+        option = find_option_by_key(question, key)
+        if option:
+            selected_lines.append(f"- {option.text}")
 
-        for custom_entry in entry.get("custom", []):
-            if isinstance(custom_entry, dict):
-                option_label = custom_entry.get("option", "✍️ Другое")
-                value = custom_entry.get("value", "")
-                if value:
-                    selected_lines.append(f"- {option_label}: {value}")
+    for custom_entry in entry.get("custom", ()):
+        if isinstance(custom_entry, dict):
+            option_label = custom_entry.get("option", "✍️ Другое")
+            value = custom_entry.get("value", "")
+            if value:
+                selected_lines.append(f"- {option_label}: {value}")
 
-        if selected_lines:
-            text += "\n\n*Выбрано:*\n" + "\n".join(selected_lines)
+    if not selected_lines:
+        return question.text
 
-    return text
+    selected_lines.insert(0, f"{question.text}\n\n*Выбрано:*")
+    return "\n".join(selected_lines)
 
 
 async def _refresh_question_message(
@@ -290,20 +308,21 @@ def _state_for_question(question: Question) -> int:
 async def handle_question_callback(update: Update, context: Context) -> int:
     query = update.callback_query
     await query.answer()
+    user_data = ensure_user_data(context.user_data)
 
-    parts = query.data.split("|")
-    if len(parts) != 3:
+    _, _, rest = query.data.partition("|")
+    question_id, sep, payload = rest.partition("|")
+    if not sep or "|" in payload:
         logger.warning("Unexpected callback data: %s", query.data)
         return ConversationState.DIAGNOSIS
 
-    _, question_id, payload = parts
     question = get_question_by_id(question_id)
     if not question:
         logger.warning("Unknown question id: %s", question_id)
         return ConversationState.DIAGNOSIS
 
     if payload == "done":
-        return await _handle_multi_done(query, context, question)
+        return await _handle_multi_done(query, context, question, user_data)
 
     option = find_option_by_key(question, payload)
     if not option:
@@ -311,7 +330,7 @@ async def handle_question_callback(update: Update, context: Context) -> int:
         return _state_for_question(question)
 
     if option.requires_free_text:
-        context.user_data[AWAITING_OTHER_KEY] = {
+        user_data[AWAITING_OTHER_KEY] = {
             "question_id": question.id,
             "option_text": option.text,
             "section": question.section,
@@ -323,7 +342,6 @@ async def handle_question_callback(update: Update, context: Context) -> int:
         return _state_for_question(question)
 
     if question.multi_select:
-        user_data = ensure_user_data(context.user_data)
         toggle_multi_option(user_data, question, option)
         selected_keys = set(get_selected_option_keys(user_data, question.id))
         reply_markup = keyboards.question_options_keyboard(question, selected_keys)
@@ -338,15 +356,14 @@ async def handle_question_callback(update: Update, context: Context) -> int:
         )
         return _state_for_question(question)
 
-    record_single_answer(context.user_data, question.id, option.text)
+    record_single_answer(user_data, question.id, option.text)
     chat_id = query.message.chat_id
-    return await send_next_question(chat_id, context)
+    return await send_next_question(chat_id, context, user_data)
 
 
 async def _handle_multi_done(
-    query, context: Context, question: Question
+    query, context: Context, question: Question, user_data: Dict[str, Any]
 ) -> int:
-    user_data = ensure_user_data(context.user_data)
     selected_keys = get_selected_option_keys(user_data, question.id)
     
     # Проверяем также кастомные ответы
@@ -359,38 +376,36 @@ async def _handle_multi_done(
         return _state_for_question(question)
     
     chat_id = query.message.chat_id
-    return await send_next_question(chat_id, context)
+    return await send_next_question(chat_id, context, user_data)
+
+
 async def handle_text_response(update: Update, context: Context) -> int:
     user_data = ensure_user_data(context.user_data)
-    text = (update.message.text or "").strip()
+    text = update.message.text.strip() if update.message.text else ""
 
-    other_ctx = user_data.get(AWAITING_OTHER_KEY)
-    if other_ctx:
+    # Every branch below clears the awaiting marker, so pop once up front.
+    if (other_ctx := user_data.pop(AWAITING_OTHER_KEY, None)) is not None:
         question_id = other_ctx["question_id"]
         question = get_question_by_id(question_id)
         if not question:
-            user_data.pop(AWAITING_OTHER_KEY, None)
             await update.message.reply_text(messages.PRE_CHAT_REMINDER)
             return ConversationState.DIAGNOSIS
 
         if question.multi_select:
             option_text = other_ctx.get("option_text", "✍️ Другое")
             append_custom_answer(user_data, question_id, option_text, text)
-            user_data.pop(AWAITING_OTHER_KEY, None)
             await _refresh_question_message(context, question, user_data)
             return _state_for_question(question)
 
         record_single_answer(user_data, question_id, text)
-        user_data.pop(AWAITING_OTHER_KEY, None)
-        return await _advance_after_text(update, context, question)
+        return await _advance_after_text(update, context, user_data)
 
-    awaiting_text_question = user_data.get(AWAITING_TEXT_KEY)
-    if awaiting_text_question:
+    if awaiting_text_question := user_data.get(AWAITING_TEXT_KEY):
         question = get_question_by_id(awaiting_text_question)
         if question:
             record_single_answer(user_data, question.id, text)
             user_data.pop(AWAITING_TEXT_KEY, None)
-            return await _advance_after_text(update, context, question)
+            return await _advance_after_text(update, context, user_data)
 
     if user_data.get(REPORT_READY_KEY):
         return await handle_chat_message(update, context)
@@ -400,10 +415,10 @@ async def handle_text_response(update: Update, context: Context) -> int:
 
 
 async def _advance_after_text(
-    update: Update, context: Context, question: Question
+    update: Update, context: Context, user_data: Dict[str, Any]
 ) -> int:
     chat_id = update.message.chat_id
-    return await send_next_question(chat_id, context)
+    return await send_next_question(chat_id, context, user_data)
 
 
 def _build_user_metadata(user: Optional[User]) -> Dict[str, Any]:
@@ -424,23 +439,52 @@ async def _store_answers_async(metadata: Dict[str, Any], snapshot: Dict[str, Any
     loop = asyncio.get_running_loop()
 
     def _task():
+        # Imported lazily so cold-start updates that never touch Google Sheets
+        # do not pay for the google-auth import.
+        from services import sheets_service
+
         sheets_service.store_answers(metadata, snapshot)
 
-    await loop.run_in_executor(None, _task)
+    await loop.run_in_executor(_EXECUTOR, _task)
+
+
+def _snapshot_user_data(user_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Cheap copy of the JSON-shaped conversation state.
+
+    Answer entries are at most dicts holding flat lists, so a two-level copy
+    isolates the snapshot from further handler mutations without paying for
+    copy.deepcopy.
+    """
+    snapshot = dict(user_data)
+    answers = user_data.get(ANSWERS_KEY)
+    if isinstance(answers, dict):
+        snapshot[ANSWERS_KEY] = {
+            question_id: (
+                {key: list(value) if isinstance(value, list) else value for key, value in entry.items()}
+                if isinstance(entry, dict)
+                else entry
+            )
+            for question_id, entry in answers.items()
+        }
+    return snapshot
 
 
 def _build_analysis_payload(user_data: Dict[str, Any]) -> Dict[str, Any]:
+    answers_by_id, pairs = build_report_views(user_data)
     return {
         "skill_level": get_skill_level_text(user_data),
         "skill_level_key": user_data.get(SKILL_LEVEL_KEY),
-        "answers": build_question_answer_pairs(user_data),
-        "answers_by_id": collect_all_answers(user_data),
+        # Pairs are NamedTuples; convert at the JSON boundary so the wire
+        # shape stays a list of objects.
+        "answers": [pair._asdict() for pair in pairs],
+        "answers_by_id": answers_by_id,
     }
 
 
 async def _analyze_answers_async(payload: Dict[str, Any]) -> Dict[str, Any]:
-    loop = asyncio.get_running_loop()
-    return await loop.run_in_executor(None, openai_service.analyze_answers, payload)
+    from services import openai_service
+
+    return await openai_service.analyze_answers(payload)
 
 
 async def _generate_pdf_async(
@@ -451,15 +495,27 @@ async def _generate_pdf_async(
     loop = asyncio.get_running_loop()
 
     def _task() -> Path:
+        from services import pdf_service
+
         return pdf_service.generate_report(metadata, user_data, analysis)
 
-    return await loop.run_in_executor(None, _task)
+    return await loop.run_in_executor(_EXECUTOR, _task)
+
+
+# Keep strong references to fire-and-forget tasks; asyncio only holds weak
+# ones and may garbage-collect a running task otherwise.
+_BACKGROUND_TASKS: set = set()
 
 
-async def _schedule_follow_up(application, chat_id: int) -> None:
+def _track_background_task(task) -> None:
+    _BACKGROUND_TASKS.add(task)
+    task.add_done_callback(_BACKGROUND_TASKS.discard)
+
+
+async def _schedule_follow_up(bot, chat_id: int) -> None:
     await asyncio.sleep(30)
     keyboard = keyboards.consultation_keyboard()
-    await application.bot.send_message(
+    await bot.send_message(
         chat_id=chat_id,
         text=messages.POST_REPORT_MESSAGE,
         reply_markup=keyboard,
@@ -472,10 +528,17 @@ def _build_chat_payload(user_data: Dict[str, Any], user_message: str) -> Dict[st
     analysis_payload = user_data.get("analysis_payload") or {}
     history = get_chat_history(user_data)
 
+    answers = analysis_payload.get("answers")
+    answers_by_id = analysis_payload.get("answers_by_id")
+    if not answers or not answers_by_id:
+        fallback_by_id, fallback_pairs = build_report_views(user_data)
+        answers = answers or [pair._asdict() for pair in fallback_pairs]
+        answers_by_id = answers_by_id or fallback_by_id
+
     return {
         "analysis": analysis,
-        "answers": analysis_payload.get("answers") or build_question_answer_pairs(user_data),
-        "answers_by_id": analysis_payload.get("answers_by_id") or collect_all_answers(user_data),
+        "answers": answers,
+        "answers_by_id": answers_by_id,
         "skill_level": get_skill_level_text(user_data),
         "history": history,
         "user_message": user_message,
@@ -483,8 +546,9 @@ def _build_chat_payload(user_data: Dict[str, Any], user_message: str) -> Dict[st
 
 
 async def _generate_chat_reply_async(payload: Dict[str, Any]) -> str:
-    loop = asyncio.get_running_loop()
-    return await loop.run_in_executor(None, openai_service.generate_chat_reply, payload)
+    from services import openai_service
+
+    return await openai_service.generate_chat_reply(payload)
 
 
 async def handle_questionnaire_complete(chat_id: int, context: Context) -> int:
@@ -513,27 +577,38 @@ async def handle_report_request(update: Update, context: Context) -> int:
 
     metadata = _build_user_metadata(query.from_user)
 
+    snapshot = _snapshot_user_data(user_data)
+
+    # The Sheets save and the OpenAI analysis are independent; overlap them so
+    # Sheets latency is not added to the user-visible time before the PDF.
+    sheets_task: Optional[asyncio.Task] = None
     if not user_data.get(SHEETS_SAVED_KEY):
-        snapshot = copy.deepcopy(user_data)
-        await _store_answers_async(metadata, snapshot)
-        user_data[SHEETS_SAVED_KEY] = True
+        sheets_task = asyncio.create_task(_store_answers_async(metadata, snapshot))
 
-    snapshot = copy.deepcopy(user_data)
     analysis_payload = _build_analysis_payload(snapshot)
     analysis = await _analyze_answers_async(analysis_payload)
+
+    if sheets_task is not None:
+        try:
+            await sheets_task
+            user_data[SHEETS_SAVED_KEY] = True
+        except Exception as exc:  # pragma: no cover - defensive logging
+            logger.warning("Failed to store answers: %s", exc)
+
     pdf_path = await _generate_pdf_async(metadata, snapshot, analysis)
 
     chat_id = query.message.chat_id
 
     try:
-        with pdf_path.open("rb") as pdf_file:
-            await context.bot.send_document(
-                chat_id=chat_id,
-                document=pdf_file,
-                filename=pdf_path.name,
-                caption=messages.REPORT_DELIVERY_MESSAGE,
-                parse_mode=ParseMode.MARKDOWN,
-            )
+        # PTB streams from a path directly instead of buffering the whole
+        # file in memory first.
+        await context.bot.send_document(
+            chat_id=chat_id,
+            document=pdf_path,
+            filename=pdf_path.name,
+            caption=messages.REPORT_DELIVERY_MESSAGE,
+            parse_mode=ParseMode.MARKDOWN,
+        )
     finally:
         pdf_path.unlink(missing_ok=True)
 
@@ -542,8 +617,10 @@ async def handle_report_request(update: Update, context: Context) -> int:
     context.user_data["analysis_payload"] = analysis_payload
     context.user_data["answers_snapshot"] = snapshot
 
-    follow_up_task = _schedule_follow_up(context.application, chat_id)
-    context.application.create_task(follow_up_task)
+    follow_up_task = context.application.create_task(
+        _schedule_follow_up(context.bot, chat_id)
+    )
+    _track_background_task(follow_up_task)
 
     return ConversationState.REPORT
 
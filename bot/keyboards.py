@@ -2,19 +2,23 @@
 
 from __future__ import annotations
 
-from typing import Iterable, List, Optional, Sequence, Set
+import functools
+from typing import List, Optional, Set
 
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup
 
 from config import settings
 from . import messages
-from .questions import Option, Question
+from .questions import Question, get_all_questions
 
 
-def _build_inline_keyboard(rows: Sequence[Sequence[InlineKeyboardButton]]) -> InlineKeyboardMarkup:
-    return InlineKeyboardMarkup(list(rows))
+def _build_inline_keyboard(rows: List[List[InlineKeyboardButton]]) -> InlineKeyboardMarkup:
+    # Callers always pass freshly built lists, so hand them over without
+    # another copy.
+    return InlineKeyboardMarkup(rows)
 
 
+@functools.lru_cache(maxsize=1)
 def skill_level_keyboard() -> InlineKeyboardMarkup:
     buttons: List[List[InlineKeyboardButton]] = []
     for callback_data, text in messages.SKILL_LEVEL_OPTIONS:
@@ -24,39 +28,59 @@ def skill_level_keyboard() -> InlineKeyboardMarkup:
     return _build_inline_keyboard(buttons)
 
 
+@functools.lru_cache(maxsize=1)
 def start_keyboard() -> InlineKeyboardMarkup:
     return single_button_keyboard(messages.START_BUTTON)
 
 
+@functools.lru_cache(maxsize=8)
 def single_button_keyboard(button_data: tuple[str, str]) -> InlineKeyboardMarkup:
     callback_data, text = button_data
     return _build_inline_keyboard([[InlineKeyboardButton(text=text, callback_data=callback_data)]])
 
 
+@functools.lru_cache(maxsize=1)
+def _question_by_id() -> dict[str, Question]:
+    return {question.id: question for question in get_all_questions()}
+
+
 def question_options_keyboard(
     question: Question,
     selected_options: Set[str] | None = None,
 ) -> InlineKeyboardMarkup:
-    selected_options = selected_options or set()
-    rows: List[List[InlineKeyboardButton]] = []
-
-    if question.options:
-        for option in question.options:
-            rows.append(
-                [
-                    InlineKeyboardButton(
-                        text=_display_option_text(option, selected_options),
-                        callback_data=f"q|{question.id}|{option.key}",
-                    )
-                ]
+    # The markup is a pure function of (question, selected set); map the
+    # selection onto a bitmask over the option order so toggles hit a small
+    # bounded cache instead of rebuilding every button.
+    mask = 0
+    if selected_options and question.options:
+        for index, option in enumerate(question.options):
+            if option.key in selected_options:
+                mask |= 1 << index
+    return _keyboard_for_mask(question.id, mask)
+
+
+@functools.lru_cache(maxsize=4096)
+def _keyboard_for_mask(question_id: str, selected_mask: int) -> InlineKeyboardMarkup:
+    # selected_mask stays in the cache key so a per-option selected marker
+    # (e.g. a ternary prepending "✅") can be reintroduced without
+    # restructuring; button text itself does not depend on selection today.
+    question = _question_by_id()[question_id]
+    rows: List[List[InlineKeyboardButton]] = [
+        [
+            InlineKeyboardButton(
+                text=option.text,
+                callback_data=f"q|{question_id}|{option.key}",
             )
+        ]
+        for option in question.options or ()
+    ]
 
     if question.multi_select:
         rows.append(
             [
                 InlineKeyboardButton(
                     text=messages.MULTI_SELECT_DONE_BUTTON[1],
-                    callback_data=f"q|{question.id}|done",
+                    callback_data=f"q|{question_id}|done",
                 )
             ]
         )
@@ -64,12 +88,7 @@ def question_options_keyboard(
     return _build_inline_keyboard(rows)
 
 
-def _display_option_text(option: Option, selected_options: Set[str]) -> str:
-    if option.key in selected_options:
-        return option.text
-    return option.text
-
-
+@functools.lru_cache(maxsize=1)
 def consultation_keyboard() -> Optional[InlineKeyboardMarkup]:
     url = settings.consultation_url.strip()
     if not url:
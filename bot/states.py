@@ -1,11 +1,13 @@
-from enum import Enum, auto
+from enum import IntEnum
 
 
-class ConversationState(Enum):
-    WELCOME = auto()
-    SKILL_LEVEL = auto()
-    VIDEO = auto()
-    DIAGNOSIS = auto()
-    READINESS = auto()
-    REPORT = auto()
-    CHAT = auto()
+class ConversationState(IntEnum):
+    # IntEnum keeps ConversationHandler's state lookups on plain int
+    # hashing/equality; values are explicit so they stay stable.
+    WELCOME = 1
+    SKILL_LEVEL = 2
+    VIDEO = 3
+    DIAGNOSIS = 4
+    READINESS = 5
+    REPORT = 6
+    CHAT = 7
@@ -3,7 +3,8 @@
 from __future__ import annotations
 
 import re
-from typing import Any, Dict, List, Optional, Tuple
+from collections import deque
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
 
 from . import messages
 from .questions import Option, Question, get_all_questions
@@ -18,17 +19,26 @@ DIAGNOSIS_COMPLETE_KEY = "diagnosis_complete"
 CURRENT_QUESTION_MESSAGE_KEY = "current_question_message"
 SHEETS_SAVED_KEY = "sheets_saved"
 CHAT_HISTORY_KEY = "chat_history"
+CHAT_HISTORY_LIMIT = 12
+
+# The questionnaire is static, so the sequence and the id index are built once
+# at import instead of re-concatenating the lists on every interaction.
+_QUESTIONS: Tuple[Question, ...] = tuple(get_all_questions())
+_QUESTION_BY_ID: Dict[str, Question] = {question.id: question for question in _QUESTIONS}
 
 
 def reset_user_session(user_data: Dict[str, Any]) -> None:
     user_data.clear()
-    user_data[ANSWERS_KEY] = {}
-    user_data[QUESTION_INDEX_KEY] = 0
-    user_data[REPORT_READY_KEY] = False
-    user_data[DIAGNOSIS_COMPLETE_KEY] = False
-    user_data.pop(CURRENT_QUESTION_MESSAGE_KEY, None)
-    user_data[SHEETS_SAVED_KEY] = False
-    user_data[CHAT_HISTORY_KEY] = []
+    user_data.update(
+        {
+            ANSWERS_KEY: {},
+            QUESTION_INDEX_KEY: 0,
+            REPORT_READY_KEY: False,
+            DIAGNOSIS_COMPLETE_KEY: False,
+            SHEETS_SAVED_KEY: False,
+            CHAT_HISTORY_KEY: deque(maxlen=CHAT_HISTORY_LIMIT),
+        }
+    )
 
 
 def ensure_user_data(user_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -37,8 +47,8 @@ def ensure_user_data(user_data: Dict[str, Any]) -> Dict[str, Any]:
     return user_data
 
 
-def get_all_question_sequence() -> List[Question]:
-    return get_all_questions()
+def get_all_question_sequence() -> Tuple[Question, ...]:
+    return _QUESTIONS
 
 
 def get_current_question(user_data: Dict[str, Any]) -> Optional[Question]:
@@ -59,8 +69,8 @@ def advance_question(user_data: Dict[str, Any]) -> Optional[Question]:
 
 
 def record_answer(user_data: Dict[str, Any], question_id: str, value: Any) -> None:
-    answers = user_data.setdefault(ANSWERS_KEY, {})
-    answers[question_id] = value
+    # ensure_user_data guarantees the answers dict exists.
+    user_data[ANSWERS_KEY][question_id] = value
 
 
 def get_answer(user_data: Dict[str, Any], question_id: str, default: Any = None) -> Any:
@@ -72,9 +82,14 @@ def toggle_multi_option(
     question: Question,
     option: Option,
 ) -> Dict[str, Any]:
-    answers = user_data.setdefault(ANSWERS_KEY, {})
-    entry: Dict[str, Any] = answers.setdefault(question.id, {"selected": [], "custom": []})
-    selected: List[str] = entry.setdefault("selected", [])
+    answers = user_data[ANSWERS_KEY]
+    # setdefault would allocate the default dict and lists on every toggle;
+    # build them only when the entry is missing.
+    entry: Optional[Dict[str, Any]] = answers.get(question.id)
+    if entry is None:
+        entry = {"selected": [], "custom": []}
+        answers[question.id] = entry
+    selected: List[str] = entry["selected"]
     if option.key in selected:
         selected.remove(option.key)
     else:
@@ -88,15 +103,16 @@ def get_selected_option_keys(user_data: Dict[str, Any], question_id: str) -> Lis
 
 
 def append_custom_answer(user_data: Dict[str, Any], question_id: str, option_text: str, value: str) -> None:
-    answers = user_data.setdefault(ANSWERS_KEY, {})
-    entry: Dict[str, Any] = answers.setdefault(question_id, {"selected": [], "custom": []})
-    custom: List[Dict[str, str]] = entry.setdefault("custom", [])
-    custom.append({"option": option_text, "value": value})
+    answers = user_data[ANSWERS_KEY]
+    entry: Optional[Dict[str, Any]] = answers.get(question_id)
+    if entry is None:
+        entry = {"selected": [], "custom": []}
+        answers[question_id] = entry
+    entry["custom"].append({"option": option_text, "value": value})
 
 
 def record_single_answer(user_data: Dict[str, Any], question_id: str, value: Any) -> None:
-    answers = user_data.setdefault(ANSWERS_KEY, {})
-    answers[question_id] = value
+    user_data[ANSWERS_KEY][question_id] = value
 
 
 def set_current_question_message(user_data: Dict[str, Any], chat_id: int, message_id: int) -> None:
@@ -114,18 +130,14 @@ def get_current_question_message(user_data: Dict[str, Any]) -> Optional[Dict[str
 
 
 def get_question_by_id(question_id: str) -> Optional[Question]:
-    for question in get_all_question_sequence():
-        if question.id == question_id:
-            return question
-    return None
+    return _QUESTION_BY_ID.get(question_id)
+
+
+_SKILL_LEVEL_TEXT = dict(messages.SKILL_LEVEL_OPTIONS)
 
 
 def get_skill_level_text(user_data: Dict[str, Any]) -> str:
-    skill_key = user_data.get(SKILL_LEVEL_KEY, "")
-    for key, text in messages.SKILL_LEVEL_OPTIONS:
-        if key == skill_key:
-            return text
-    return ""
+    return _SKILL_LEVEL_TEXT.get(user_data.get(SKILL_LEVEL_KEY, ""), "")
 
 
 def format_question_answer(question: Question, user_data: Dict[str, Any]) -> str:
@@ -161,47 +173,93 @@ def collect_all_answers(user_data: Dict[str, Any]) -> Dict[str, str]:
     return answers
 
 
+_OPTIONS_BY_KEY: Dict[str, Dict[str, Option]] = {}
+
+
 def find_option_by_key(question: Question, key: str) -> Optional[Option]:
     if not question.options:
         return None
-    for option in question.options:
-        if option.key == key:
-            return option
-    return None
+    options_map = _OPTIONS_BY_KEY.get(question.id)
+    if options_map is None:
+        options_map = {option.key: option for option in question.options}
+        _OPTIONS_BY_KEY[question.id] = options_map
+    return options_map.get(key)
+
 
+class QuestionAnswerPair(NamedTuple):
+    """One question/answer record; a tuple beats a dict per question here.
 
-def build_question_answer_pairs(user_data: Dict[str, Any]) -> List[Dict[str, str]]:
-    pairs: List[Dict[str, str]] = []
+    Callers that serialize pairs to JSON should convert with ``_asdict()``
+    at the boundary to keep the wire shape unchanged.
+    """
+
+    id: str
+    question: str
+    answer: str
+
+
+def build_question_answer_pairs(user_data: Dict[str, Any]) -> List[QuestionAnswerPair]:
+    pairs: List[QuestionAnswerPair] = []
     for question in get_all_question_sequence():
         pairs.append(
-            {
-                "id": question.id,
-                "question": strip_markdown(question.text),
-                "answer": format_question_answer(question, user_data),
-            }
+            QuestionAnswerPair(
+                id=question.id,
+                question=strip_markdown(question.text),
+                answer=format_question_answer(question, user_data),
+            )
         )
     return pairs
 
 
-def strip_markdown(text: str) -> str:
-    stripped = re.sub(r"^>\s*", "", text, flags=re.MULTILINE)
-    stripped = stripped.replace("**", "")
-    stripped = stripped.replace("*", "")
-    stripped = stripped.replace("`", "")
-    stripped = stripped.replace("_", "")
-    stripped = re.sub(r"\s+", " ", stripped)
-    return stripped.strip()
+def build_report_views(
+    user_data: Dict[str, Any]
+) -> Tuple[Dict[str, str], List[QuestionAnswerPair]]:
+    """Build the by-id answer map and the question/answer pairs in one pass.
 
+    The report pipeline needs both views; fusing them avoids formatting every
+    answer twice.
+    """
+    _format = format_question_answer
+    _strip = strip_markdown
+    answers: Dict[str, str] = {}
+    pairs: List[QuestionAnswerPair] = []
+    for question in _QUESTIONS:
+        answer = _format(question, user_data)
+        answers[question.id] = answer
+        pairs.append(QuestionAnswerPair(question.id, _strip(question.text), answer))
+    return answers, pairs
 
-def append_chat_history(user_data: Dict[str, Any], role: str, message: str, limit: int = 12) -> None:
-    history: List[Dict[str, str]] = user_data.setdefault(CHAT_HISTORY_KEY, [])
+
+_LEAD_QUOTE_RE = re.compile(r"^>\s*", re.MULTILINE)
+_WHITESPACE_RE = re.compile(r"\s+")
+# Removing "*" also covers "**"; backticks and underscores strip the same way.
+_MD_TABLE = str.maketrans("", "", "*`_")
+_MD_CHARS = frozenset("*`_>")
+
+
+def strip_markdown(text: str) -> str:
+    if not _MD_CHARS.intersection(text):
+        # Plain text (the common case) only needs whitespace collapsed.
+        return _WHITESPACE_RE.sub(" ", text).strip()
+    stripped = _LEAD_QUOTE_RE.sub("", text)
+    stripped = stripped.translate(_MD_TABLE)
+    return _WHITESPACE_RE.sub(" ", stripped).strip()
+
+
+def append_chat_history(
+    user_data: Dict[str, Any], role: str, message: str, limit: int = CHAT_HISTORY_LIMIT
+) -> None:
+    history = user_data.get(CHAT_HISTORY_KEY)
+    if not isinstance(history, deque) or history.maxlen != limit:
+        # Migrate pre-deque sessions (or a changed limit); the deque evicts
+        # old entries in O(1) instead of the old list slice-delete.
+        history = deque(history or (), maxlen=limit)
+        user_data[CHAT_HISTORY_KEY] = history
     history.append({"role": role, "message": message})
-    if len(history) > limit:
-        del history[0 : len(history) - limit]
 
 
 def get_chat_history(user_data: Dict[str, Any]) -> List[Dict[str, str]]:
-    history = user_data.get(CHAT_HISTORY_KEY, [])
-    if isinstance(history, list):
+    history = user_data.get(CHAT_HISTORY_KEY, ())
+    if isinstance(history, (deque, list)):
         return list(history)
     return []
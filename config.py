@@ -3,10 +3,14 @@ from dataclasses import dataclass
 
 from dotenv import load_dotenv
 
-load_dotenv()
+# Guarded so repeated imports (or reloads) across the process do not re-scan
+# the .env file.
+if not os.environ.get("_DOTENV_LOADED"):
+    load_dotenv()
+    os.environ["_DOTENV_LOADED"] = "1"
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Settings:
     telegram_token: str = os.environ.get("TELEGRAM_BOT_TOKEN", "")
     telegram_secret_token: str = os.environ.get("TELEGRAM_SECRET_TOKEN", "")
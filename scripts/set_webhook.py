@@ -5,11 +5,17 @@ import argparse
 import json
 import os
 import sys
-import urllib.parse
 import urllib.request
 
 from dotenv import load_dotenv
 
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+except ImportError:  # pragma: no cover - stdlib fallback
+    _json_loads = json.loads
+
 load_dotenv()
 
 API_ROOT = "https://api.telegram.org"
@@ -17,11 +23,12 @@ API_ROOT = "https://api.telegram.org"
 
 def _call_telegram(method: str, token: str, **params):
     url = f"{API_ROOT}/bot{token}/{method}"
-    data = urllib.parse.urlencode(params).encode()
-    request = urllib.request.Request(url, data=data)
+    # JSON body: no percent-escaping of the webhook URL or secret token.
+    data = json.dumps(params).encode("utf-8")
+    request = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
     with urllib.request.urlopen(request) as response:  # nosec B310
         payload = response.read()
-    return json.loads(payload)
+    return _json_loads(payload)
 
 
 def set_webhook(token: str, url: str, secret: str | None = None) -> dict:
@@ -2,6 +2,7 @@
 """Script to automatically download DejaVu Sans font for PDF Cyrillic support."""
 
 import os
+import shutil
 import sys
 import urllib.request
 import zipfile
@@ -40,14 +41,9 @@ def download_font() -> bool:
                 if response.status != 200:
                     print(f"✗ HTTP {response.status}")
                     return False
-                
-                # Download in chunks
-                chunk_size = 8192
-                while True:
-                    chunk = response.read(chunk_size)
-                    if not chunk:
-                        break
-                    tmp_file.write(chunk)
+
+                # Stream to disk in chunks without buffering the archive
+                shutil.copyfileobj(response, tmp_file, 64 * 1024)
         
         print("Extracting font from archive...")
         # Extract DejaVuSans.ttf from zip
@@ -59,7 +55,8 @@ def download_font() -> bool:
                     print(f"Found font: {file_info}")
                     with zip_ref.open(file_info) as source:
                         with open(FONT_FILE, 'wb') as target:
-                            target.write(source.read())
+                            # Stream instead of reading the whole font into memory
+                            shutil.copyfileobj(source, target, 64 * 1024)
                     font_found = True
                     break
             
@@ -2,13 +2,32 @@
 
 from __future__ import annotations
 
+import functools
 import json
 import logging
 from typing import Any, Dict
 
-from openai import OpenAI
+from openai import AsyncOpenAI
 
 from config import settings
+from services.text_sanitizer import fix_encoding
+
+# Compact separators: the model does not need indentation, and every level of
+# pretty-printing costs prompt tokens.
+_JSON_SEPARATORS = (",", ":")
+
+try:
+    import orjson
+
+    def _json_dumps(obj: Any) -> str:
+        return orjson.dumps(obj).decode()
+
+    _json_loads = orjson.loads
+except ImportError:  # pragma: no cover - stdlib fallback
+    def _json_dumps(obj: Any) -> str:
+        return json.dumps(obj, ensure_ascii=False, separators=_JSON_SEPARATORS)
+
+    _json_loads = json.loads
 
 logger = logging.getLogger(__name__)
 
@@ -55,19 +74,30 @@ DEFAULT_ANALYSIS: Dict[str, Any] = {
     "gpt_prompts": [],
 }
 
-_client: OpenAI | None = None
+# The system messages never change; build the nested dicts once instead of on
+# every request.
+_ANALYSIS_SYSTEM_MSG = {
+    "role": "system",
+    "content": [{"type": "input_text", "text": ANALYSIS_SYSTEM_PROMPT}],
+}
+_CHAT_SYSTEM_MSG = {
+    "role": "system",
+    "content": [{"type": "input_text", "text": CHAT_SYSTEM_PROMPT}],
+}
 
 
-def _get_client() -> OpenAI:
-    global _client
-    if _client is None:
-        if not settings.openai_api_key:
-            raise RuntimeError("OPENAI_API_KEY is not configured.")
-        _client = OpenAI(api_key=settings.openai_api_key)
-    return _client
+@functools.lru_cache(maxsize=1)
+def _get_client() -> AsyncOpenAI:
+    if not settings.openai_api_key:
+        raise RuntimeError("OPENAI_API_KEY is not configured.")
+    # lru_cache guards construction against concurrent first calls, so only
+    # one client (and one httpx connection pool) exists per process; the
+    # shared client keeps the TLS connection to api.openai.com alive between
+    # sequential analyze/chat calls.
+    return AsyncOpenAI(api_key=settings.openai_api_key)
 
 
-def analyze_answers(payload: Dict[str, Any]) -> Dict[str, Any]:
+async def analyze_answers(payload: Dict[str, Any]) -> Dict[str, Any]:
     """Call OpenAI to generate structured AI recommendations."""
     try:
         client = _get_client()
@@ -78,10 +108,10 @@ def analyze_answers(payload: Dict[str, Any]) -> Dict[str, Any]:
     request_payload = _build_prompt_payload(payload)
 
     try:
-        response = client.responses.create(
+        response = await client.responses.create(
             model=settings.openai_model,
             input=[
-                {"role": "system", "content": [{"type": "input_text", "text": ANALYSIS_SYSTEM_PROMPT}]},
+                _ANALYSIS_SYSTEM_MSG,
                 {"role": "user", "content": [{"type": "input_text", "text": request_payload}]},
             ],
             reasoning={"effort": "medium"},
@@ -105,15 +135,15 @@ def analyze_answers(payload: Dict[str, Any]) -> Dict[str, Any]:
         return DEFAULT_ANALYSIS.copy()
 
     try:
-        parsed: Dict[str, Any] = json.loads(output_text)
-    except json.JSONDecodeError as exc:
+        parsed: Dict[str, Any] = _json_loads(output_text)
+    except ValueError as exc:
         logger.error("Failed to parse OpenAI analysis JSON: %s", exc)
         return DEFAULT_ANALYSIS.copy()
 
     return _merge_with_default(parsed)
 
 
-def generate_chat_reply(payload: Dict[str, Any]) -> str:
+async def generate_chat_reply(payload: Dict[str, Any]) -> str:
     try:
         client = _get_client()
     except RuntimeError as exc:
@@ -123,10 +153,10 @@ def generate_chat_reply(payload: Dict[str, Any]) -> str:
     request_payload = _build_chat_prompt(payload)
 
     try:
-        response = client.responses.create(
+        response = await client.responses.create(
             model=settings.openai_model,
             input=[
-                {"role": "system", "content": [{"type": "input_text", "text": CHAT_SYSTEM_PROMPT}]},
+                _CHAT_SYSTEM_MSG,
                 {"role": "user", "content": [{"type": "input_text", "text": request_payload}]},
             ],
             reasoning={"effort": "medium"},
@@ -148,50 +178,58 @@ def generate_chat_reply(payload: Dict[str, Any]) -> str:
     if not output_text:
         logger.error("OpenAI chat response did not contain text output.")
         return ""
-    return output_text.strip()
+    return fix_encoding(output_text.strip())
+
+
+_ANALYSIS_PROMPT_PREFIX = ANALYSIS_USER_PROMPT + "\n\nДанные клиента:\n"
+_CHAT_PROMPT_PREFIX = (
+    "Используй эти данные, чтобы ответить клиенту на его вопрос. "
+    "Сформулируй ответ полностью на русском языке, без JSON, в виде нескольких абзацев и маркеров при необходимости.\n\n"
+)
 
 
 def _build_prompt_payload(payload: Dict[str, Any]) -> str:
     """Serialize payload for the model."""
-    serialized = json.dumps(payload, ensure_ascii=False, indent=2)
-    return f"{ANALYSIS_USER_PROMPT}\n\nДанные клиента:\n{serialized}"
+    return _ANALYSIS_PROMPT_PREFIX + _json_dumps(payload)
 
 
 def _build_chat_prompt(payload: Dict[str, Any]) -> str:
-    serialized = json.dumps(payload, ensure_ascii=False, indent=2)
-    return (
-        "Используй эти данные, чтобы ответить клиенту на его вопрос. "
-        "Сформулируй ответ полностью на русском языке, без JSON, в виде нескольких абзацев и маркеров при необходимости.\n\n"
-        f"{serialized}"
-    )
+    return _CHAT_PROMPT_PREFIX + _json_dumps(payload)
 
 
 def _extract_text(response) -> str:
     """Fallback extraction for older SDK versions."""
-    try:
-        return "".join(
-            part.text
-            for part in getattr(response, "output", [])
-            if getattr(part, "text", None)
-        )
-    except Exception:  # pragma: no cover - defensive
+    parts = getattr(response, "output", None) or ()
+    if not parts:
         return ""
+    if len(parts) == 1:
+        return getattr(parts[0], "text", "") or ""
+    return "".join(part.text for part in parts if getattr(part, "text", None))
+
+
+# Field types never change, so they are classified once instead of sniffing
+# the default value per key per merge.
+_LIST_FIELDS = frozenset(key for key, value in DEFAULT_ANALYSIS.items() if isinstance(value, list))
 
 
 def _merge_with_default(parsed: Dict[str, Any]) -> Dict[str, Any]:
-    result = DEFAULT_ANALYSIS.copy()
-    for key in result.keys():
-        value = parsed.get(key, result[key])
-        if isinstance(result[key], list):
-            result[key] = _ensure_list_of_strings(value)
-        else:
-            result[key] = str(value) if value is not None else ""
-    return result
+    # Encoding repair happens here, at the ingestion boundary, so downstream
+    # consumers (PDF rendering, chat payloads) can trust the strings.
+    return {
+        key: (
+            _ensure_list_of_strings(parsed.get(key))
+            if key in _LIST_FIELDS
+            else (fix_encoding(str(value)) if (value := parsed.get(key)) is not None else "")
+        )
+        for key in DEFAULT_ANALYSIS
+    }
 
 
 def _ensure_list_of_strings(value: Any) -> list[str]:
+    if not value:
+        return []
     if isinstance(value, list):
-        return [str(item) for item in value if item is not None]
-    if isinstance(value, str) and value:
-        return [value]
+        return [fix_encoding(str(item)) for item in value if item is not None]
+    if isinstance(value, str):
+        return [fix_encoding(value)]
     return []
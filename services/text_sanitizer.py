@@ -0,0 +1,61 @@
+"""Text encoding repair applied once at ingestion.
+
+Mojibake can only enter from an upstream source (the OpenAI response), so
+the repair runs where those strings are produced. The PDF renderer and
+other consumers then trust their inputs and skip per-paragraph encoding
+work.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+# Byte patterns that Windows-1251 Cyrillic produces when misread as Latin-1.
+_SUSPICIOUS_PATTERNS = (
+    'Aô', 'ACä', 'CD>', 'Cd=', 'C¤', 'BC', 'CÔ', 'CD@',
+    'D$', 'Cä', 'CT=', 'CD0', 'Dd8', 'Dô', 'E D4',
+)
+_MOJIBAKE_RE = re.compile("|".join(map(re.escape, _SUSPICIOUS_PATTERNS)))
+_CYRILLIC_RE = re.compile('[Ѐ-ӿ]')
+_LATIN1_HIGH_RE = re.compile('[\x80-\xff]')
+# Maps each Latin-1 code point to the character CP1251 assigns the same byte,
+# so the latin-1-encode/cp1251-decode repair becomes one translate pass with
+# no intermediate bytes object.
+_CP1251_FIX_TABLE = {i: bytes([i]).decode('cp1251', errors='replace') for i in range(256)}
+
+
+def fix_encoding(text: str) -> str:
+    """
+    Detect and fix incorrectly decoded text.
+    Common issue: Windows-1251 (CP1251) text read as Latin-1.
+    Returns normalized UTF-8 string without HTML escaping.
+    """
+    if not text or not isinstance(text, str):
+        return text
+
+    # Valid Cyrillic means the text decoded correctly -- the common case for
+    # LLM output; one C-level regex scan and we are done.
+    if _CYRILLIC_RE.search(text):
+        return text
+
+    # Mojibake shows up either as known byte patterns or as a high share of
+    # Latin-1 upper-range characters without any real Cyrillic.
+    has_suspicious = _MOJIBAKE_RE.search(text) is not None
+    has_latin1_mojibake = (
+        not has_suspicious
+        and len(_LATIN1_HIGH_RE.findall(text)) > len(text) * 0.3
+    )
+
+    if has_suspicious or has_latin1_mojibake:
+        # Single-byte mojibake (the documented case) converts with one
+        # C-level translate pass instead of an encode/decode round-trip.
+        fixed = text.translate(_CP1251_FIX_TABLE)
+        # Verify the fix worked by checking for Cyrillic
+        if _CYRILLIC_RE.search(fixed):
+            logger.info("Fixed encoding issue: '%.50s...' -> '%.50s...'", text, fixed)
+            return fixed
+
+    return text